@@ -1,15 +1,268 @@
 import os
-import yaml
+import hashlib
+import io
+import logging
 from pathlib import Path
-from typing import Dict, Optional, List, Set
+from typing import BinaryIO, Dict, Optional, List, Set, Tuple
 import re
-import subprocess
+import shutil
+import tarfile
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from itertools import repeat
+
+logger = logging.getLogger(__name__)
+
+# PyYAML and its dumper/loader classes, imported on first use by _yaml_api
+_yaml: Optional[tuple] = None
+
+# Parsed models configs keyed on path, stored with the sha256 of the file contents
+_models_config_cache: Dict[str, tuple] = {}
+
+# Model files are created relative to cached layer directory descriptors where
+# the platform supports it, avoiding a full path walk per model
+_USE_DIR_FDS = hasattr(os, 'O_DIRECTORY') and os.open in os.supports_dir_fd
+
+_WRITE_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_TRUNC
+
+# Buffer size for buffered file writes; files are written without intermediate flushes
+_WRITE_BUFFER_SIZE = 1 << 20
+
+# Characters that are not allowed in model names
+_MODEL_NAME_RE = re.compile(r'[^A-Za-z0-9_]')
+
+# Directories created by dbt init for a new project
+_PROJECT_DIRS = ('models', 'analyses', 'tests', 'seeds', 'macros', 'snapshots')
+
+# dbt_project.yml scaffold; models_block holds one entry per layer and
+# project_name must be passed through _yaml_quote
+DBT_PROJECT_YML_TEMPLATE = """\
+name: {project_name}
+version: '1.0.0'
+config-version: 2
+
+profile: {project_name}
+
+model-paths: ["models"]
+analysis-paths: ["analyses"]
+test-paths: ["tests"]
+seed-paths: ["seeds"]
+macro-paths: ["macros"]
+snapshot-paths: ["snapshots"]
+
+clean-targets:
+  - "target"
+  - "dbt_packages"
+
+models:
+  {project_name}:
+{models_block}"""
+
+# profiles.yml has a fixed shape, so it is rendered from a template instead of
+# yaml.dump; project_name must be passed through _yaml_quote
+PROFILES_YML_TEMPLATE = """\
+{project_name}:
+  target: dev
+  outputs:
+    dev:
+      type: trino
+      host: localhost
+      port: 8080
+      user: admin
+      password: admin
+      catalog: hive
+      schema: default
+      threads: 4
+"""
+
+def _yaml_quote(value: str) -> str:
+    """
+    Quotes a string as a single-quoted YAML scalar for use in templates
+    
+    Args:
+        value: String to quote
+        
+    Returns:
+        Quoted scalar that always loads back as the same string
+    """
+    return "'" + value.replace("'", "''") + "'"
+
+def _yaml_api() -> tuple:
+    """
+    Imports PyYAML on first use, keeping module import cheap
+    
+    Returns:
+        Tuple of the yaml module and the SafeDumper and SafeLoader classes,
+        preferring the libyaml C bindings when PyYAML was built with them
+    """
+    global _yaml
+    if _yaml is None:
+        import yaml
+        try:
+            from yaml import CSafeDumper as SafeDumper, CSafeLoader as SafeLoader
+        except ImportError:
+            from yaml import SafeDumper, SafeLoader
+        _yaml = (yaml, SafeDumper, SafeLoader)
+    return _yaml
+
+def _dump_yaml(data: Dict) -> str:
+    """
+    Serializes data as block-style YAML, keeping key order
+    
+    Args:
+        data: Data to serialize
+        
+    Returns:
+        YAML document as a string
+    """
+    yaml, SafeDumper, _ = _yaml_api()
+    return yaml.dump(data, Dumper=SafeDumper, default_flow_style=False, sort_keys=False)
+
+def _existing_dirs(path: Path) -> Set[str]:
+    """
+    Lists the names of directories directly under path
+    
+    Args:
+        path: Directory to list
+        
+    Returns:
+        Set of directory names, empty if path does not exist
+    """
+    try:
+        with os.scandir(path) as entries:
+            return {entry.name for entry in entries if entry.is_dir()}
+    except FileNotFoundError:
+        return set()
+
+def _existing_files(path: Path) -> Set[str]:
+    """
+    Lists the names of non-directory entries directly under path
+    
+    Args:
+        path: Directory to list
+        
+    Returns:
+        Set of file names, empty if path cannot be listed
+    """
+    try:
+        with os.scandir(path) as entries:
+            return {entry.name for entry in entries if not entry.is_dir()}
+    except OSError:
+        return set()
+
+def _write_file(path, payload: bytes, dir_fd: Optional[int] = None) -> None:
+    """
+    Writes payload to path with a single unbuffered write
+    
+    Args:
+        path: Destination file path
+        payload: Encoded file contents
+        dir_fd: Optional directory descriptor that path is relative to
+    """
+    fd = os.open(path, _WRITE_FLAGS, 0o644, dir_fd=dir_fd)
+    try:
+        view = memoryview(payload)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+def _file_matches(path, src: BinaryIO, size: int, dir_fd: Optional[int] = None) -> bool:
+    """
+    Checks whether a file already holds exactly the contents of src
+    
+    Args:
+        path: Path of the existing file
+        src: Binary stream positioned at the start of the expected contents
+        size: Size of the expected contents in bytes
+        dir_fd: Optional directory descriptor that path is relative to
+        
+    Returns:
+        True if the file exists with identical contents
+    """
+    try:
+        fd = os.open(path, os.O_RDONLY, dir_fd=dir_fd)
+    except FileNotFoundError:
+        return False
+    with open(fd, 'rb') as existing:
+        if os.fstat(fd).st_size != size:
+            return False
+        while True:
+            expected = src.read(_WRITE_BUFFER_SIZE)
+            if existing.read(_WRITE_BUFFER_SIZE) != expected:
+                return False
+            if not expected:
+                return True
+
+def _write_if_changed(
+    path,
+    payload: bytes,
+    dir_fd: Optional[int] = None,
+    make_parents: bool = False
+) -> bool:
+    """
+    Writes payload to path unless the file already holds the same contents,
+    preserving its mtime so downstream caches such as dbt partial parse stay valid
+    
+    Args:
+        path: Destination file path
+        payload: Encoded file contents
+        dir_fd: Optional directory descriptor that path is relative to
+        make_parents: Create missing parent directories before writing
+        
+    Returns:
+        True if the file was written
+    """
+    if _file_matches(path, io.BytesIO(payload), len(payload), dir_fd):
+        return False
+    if make_parents:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+    _write_file(path, payload, dir_fd)
+    return True
+
+def _copy_file(src_path, dst_path, dir_fd: Optional[int] = None) -> bool:
+    """
+    Copies a file unless the destination already holds the same contents,
+    in the kernel via os.sendfile where the platform supports it
+    
+    Args:
+        src_path: Source file path
+        dst_path: Destination file path
+        dir_fd: Optional directory descriptor that dst_path is relative to
+        
+    Returns:
+        True if the file was copied
+    """
+    with open(src_path, 'rb') as src:
+        if _file_matches(dst_path, src, os.fstat(src.fileno()).st_size, dir_fd):
+            return False
+        src.seek(0)
+        
+        with open(os.open(dst_path, _WRITE_FLAGS, 0o644, dir_fd=dir_fd), 'wb') as dst:
+            if hasattr(os, 'sendfile'):
+                offset = 0
+                try:
+                    while True:
+                        sent = os.sendfile(dst.fileno(), src.fileno(), offset, 1 << 30)
+                        if not sent:
+                            return True
+                        offset += sent
+                except OSError:
+                    # Fall back to a buffered copy only if nothing was copied yet
+                    if offset:
+                        raise
+            shutil.copyfileobj(src, dst, length=_WRITE_BUFFER_SIZE)
+    return True
 
 class DbtProjectGenerator:
     def __init__(self, project_name: str, project_dir: str):
         """
         Initialize DBT project generator
         
+        create_project_structure opens directory descriptors for the model
+        layers, so callers must call close() when done, or use the generator
+        as a context manager.
+        
         Args:
             project_name: Name of the DBT project
             project_dir: Directory where project will be created
@@ -17,6 +270,12 @@ class DbtProjectGenerator:
         # Clean project name to be DBT compatible by replacing spaces with underscores
         self.project_name = project_name.replace(' ', '_')
         self.project_dir = Path(project_dir)
+        # Layers declared by create_project_structure; None until it has run
+        self._valid_layers: Optional[frozenset] = None
+        # Open directory descriptors for each layer's model directory
+        self._layer_fds: Dict[str, int] = {}
+        # Model directory path strings for each layer
+        self._layer_dirs: Dict[str, str] = {}
         
     def create_source_yml(self, sources_config: Dict):
         """
@@ -60,54 +319,54 @@ class DbtProjectGenerator:
             
             sources_content['sources'].append(source_def)
         
-        # Write source.yml file
-        with open(source_yml_path, 'w') as f:
-            yaml.dump(sources_content, f, default_flow_style=False, sort_keys=False)
+        # Write source.yml file, unless it is unchanged
+        _write_if_changed(source_yml_path, _dump_yaml(sources_content).encode('utf-8'))
             
     def create_project_structure(self, layers: Set[str], sources_config: Optional[Dict] = None):
         """
-        Creates the basic DBT project structure using dbt init
+        Creates the basic DBT project structure
         
         Args:
             layers: Set of layer names to create directories for
             sources_config: Optional dictionary containing source configurations
         """
+        self._valid_layers = frozenset(layers)
+        
         # Create project directory if it doesn't exist
         os.makedirs(self.project_dir, exist_ok=True)
         
-        # Run dbt init
-        subprocess.run(['dbt', 'init', self.project_name], cwd=self.project_dir.parent)
+        # Create the standard project directories and one model directory per
+        # layer, listing each parent once and only creating what is missing
+        for name in set(_PROJECT_DIRS) - _existing_dirs(self.project_dir):
+            (self.project_dir / name).mkdir(exist_ok=True)
+        models_dir = self.project_dir / 'models'
+        for layer in set(layers) - _existing_dirs(models_dir):
+            (models_dir / layer).mkdir(parents=True, exist_ok=True)
+        self._layer_dirs = {layer: os.fspath(models_dir / layer) for layer in layers}
+        if _USE_DIR_FDS:
+            self.close()
+            for layer in layers:
+                self._layer_fds[layer] = os.open(models_dir / layer, os.O_RDONLY | os.O_DIRECTORY)
         
-        # Create model directories for each layer
-        for layer in layers:
-            os.makedirs(self.project_dir / 'models' / layer, exist_ok=True)
+        # Create dbt_project.yml
+        models_block = ''.join(
+            f"    {quoted}:\n      +materialized: table\n      +schema: {quoted}\n"
+            for quoted in map(_yaml_quote, sorted(layers))
+        )
+        _write_if_changed(self.project_dir / 'dbt_project.yml', DBT_PROJECT_YML_TEMPLATE.format(
+            project_name=_yaml_quote(self.project_name),
+            models_block=models_block
+        ).encode('utf-8'))
             
-        # Create profiles.yml in the correct location
+        # Create profiles.yml in .dbt directory. Leave an identical file untouched,
+        # since dbt discards its partial parse state whenever the profile changes
         dbt_dir = Path('/opt/app-root/src/.dbt')
-        dbt_dir.mkdir(parents=True, exist_ok=True)
-            
-        # Create profiles.yml in .dbt directory
-        profiles_config = {
-            self.project_name: {
-                'target': 'dev',
-                'outputs': {
-                    'dev': {
-                        'type': 'trino',
-                        'host': 'localhost',
-                        'port': 8080,
-                        'user': 'admin',
-                        'password': 'admin',
-                        'catalog': 'hive',
-                        'schema': 'default',
-                        'threads': 4
-                    }
-                }
-            }
-        }
-        
         profiles_file = dbt_dir / 'profiles.yml'
-        with open(profiles_file, 'w') as f:
-            yaml.dump(profiles_config, f, default_flow_style=False, sort_keys=False)
+        profiles_content = PROFILES_YML_TEMPLATE.format(
+            project_name=_yaml_quote(self.project_name)
+        ).encode('utf-8')
+        if not _write_if_changed(profiles_file, profiles_content, make_parents=True):
+            logger.debug("profile unchanged, preserving partial_parse")
             
         # Create source.yml if sources_config is provided
         if sources_config:
@@ -158,10 +417,52 @@ class DbtProjectGenerator:
             
             models_content['models'].append(model_def)
         
-        # Write model.yml file
-        with open(model_yml_path, 'w') as f:
-            yaml.dump(models_content, f, default_flow_style=False, sort_keys=False)
+        # Write model.yml file, unless it is unchanged
+        _write_if_changed(model_yml_path, _dump_yaml(models_content).encode('utf-8'))
+            
+    def close(self) -> None:
+        """
+        Closes the layer directory descriptors opened by create_project_structure
+        """
+        while self._layer_fds:
+            os.close(self._layer_fds.popitem()[1])
+            
+    def __enter__(self) -> 'DbtProjectGenerator':
+        return self
+        
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+            
+    def _model_target(self, model_name: str, layer: str) -> Tuple[str, Optional[int]]:
+        """
+        Returns where to write a model file, creating its layer directory if needed
+        
+        Args:
+            model_name: Name of the model
+            layer: Model layer (staging/intermediate/mart)
             
+        Returns:
+            Tuple of the model file path and the directory descriptor it is
+            relative to, or None if the path is not relative to a descriptor
+        """
+        if self._valid_layers is not None and layer not in self._valid_layers:
+            raise ValueError(f"Layer must be one of {sorted(self._valid_layers)}")
+        
+        # Clean model name
+        model_name = _MODEL_NAME_RE.sub('_', model_name)
+        
+        dir_fd = self._layer_fds.get(layer)
+        if dir_fd is not None:
+            return f'{model_name}.sql', dir_fd
+        
+        layer_dir = self._layer_dirs.get(layer)
+        if layer_dir is None:
+            # Create model directory if it doesn't exist
+            layer_dir = os.fspath(self.project_dir / 'models' / layer)
+            os.makedirs(layer_dir, exist_ok=True)
+        
+        return f'{layer_dir}/{model_name}.sql', None
+        
     def create_model_from_sql(
         self,
         sql_content: str,
@@ -170,7 +471,7 @@ class DbtProjectGenerator:
         config: Optional[Dict] = None
     ) -> None:
         """
-        Creates a model file using dbt codegen
+        Creates a model file from SQL content
         
         Args:
             sql_content: SQL query content
@@ -178,62 +479,74 @@ class DbtProjectGenerator:
             layer: Model layer (staging/intermediate/mart)
             config: Optional model configurations
         """
-        # Clean model name
-        model_name = re.sub(r'[^a-zA-Z0-9_]', '_', model_name)
+        model_path, dir_fd = self._model_target(model_name, layer)
         
-        # Create model directory if it doesn't exist
-        model_dir = self.project_dir / 'models' / layer
-        os.makedirs(model_dir, exist_ok=True)
+        # Add config block if provided
+        config_block = ''
+        if config:
+            # Format config parameters
+            config_str = ',\n    '.join([f"{key}={value!r}" for key, value in config.items()])
+            config_block = f"{{{{ config(\n    {config_str}\n) }}}}\n\n"
         
-        # Generate model using dbt codegen
-        model_path = model_dir / f'{model_name}.sql'
+        # Write model file in one go, unless it is unchanged
+        _write_if_changed(model_path, (config_block + sql_content).encode('utf-8'), dir_fd)
         
-        # Write SQL content to temporary file
-        temp_sql_path = self.project_dir / 'temp.sql'
-        with open(temp_sql_path, 'w') as f:
-            f.write(sql_content)
+    def copy_model_from_sql_file(self, sql_path: Path, model_name: str, layer: str) -> None:
+        """
+        Creates a model file by streaming an SQL file that needs no config block
         
-        # Generate model using dbt codegen
-        subprocess.run([
-            'dbt', 'codegen', 
-            '--project-dir', str(self.project_dir),
-            '--profiles-dir', '/opt/app-root/src/.dbt',
-            '--target-path', str(self.project_dir / 'target'),
-            '--output', str(model_path),
-            '--sql', str(temp_sql_path)
-        ])
+        Args:
+            sql_path: Path to the SQL file
+            model_name: Name of the model
+            layer: Model layer (staging/intermediate/mart)
+        """
+        model_path, dir_fd = self._model_target(model_name, layer)
+        _copy_file(sql_path, model_path, dir_fd)
+
+def _generate_model(
+    generator: DbtProjectGenerator,
+    model_name: str,
+    sql_file: str,
+    layer: str,
+    config: Optional[Dict],
+    sql_base_dir: str
+) -> None:
+    """
+    Reads a model's SQL file and creates the model file from it
+    
+    Args:
+        generator: Project generator to create the model with
+        model_name: Name of the model
+        sql_file: SQL file path relative to sql_base_dir, already checked to exist
+        layer: Model layer (staging/intermediate/mart)
+        config: Optional model configurations
+        sql_base_dir: Base directory containing SQL files
+    """
+    sql_path = Path(sql_base_dir) / sql_file
+    
+    # Without a config block the SQL file is copied as is
+    if not config:
+        generator.copy_model_from_sql_file(sql_path, model_name, layer)
+        return
         
-        # Clean up temporary file
-        os.remove(temp_sql_path)
+    # Read SQL content from file
+    with open(sql_path, 'r', encoding='utf-8') as f:
+        sql_content = f.read()
         
-        # Add config block if provided
-        if config:
-            with open(model_path, 'r') as f:
-                content = f.read()
-            
-            # Format config parameters
-            config_params = []
-            for key, value in config.items():
-                if isinstance(value, str):
-                    config_params.append(f"{key}='{value}'")
-                elif isinstance(value, list):
-                    config_params.append(f"{key}={value}")
-                else:
-                    config_params.append(f"{key}={value}")
-            
-            config_str = ',\n    '.join(config_params)
-            config_block = f"{{{{ config(\n    {config_str}\n) }}}}\n\n"
-            
-            # Write content with config block
-            with open(model_path, 'w') as f:
-                f.write(config_block + content)
+    generator.create_model_from_sql(
+        sql_content=sql_content,
+        model_name=model_name,
+        layer=layer,
+        config=config
+    )
 
 def generate_dbt_project(
     project_name: str,
     project_dir: str,
     models_config: Dict,
     sql_base_dir: str,
-    sources_config: Optional[Dict] = None
+    sources_config: Optional[Dict] = None,
+    package: bool = False
 ) -> None:
     """
     Generates a DBT project from configuration and SQL files
@@ -244,55 +557,122 @@ def generate_dbt_project(
         models_config: Dictionary containing model configurations
         sql_base_dir: Base directory containing SQL files
         sources_config: Optional dictionary containing source configurations
+        package: Write the project as a single <project_dir>.tar archive instead
+            of individual files, for high-latency target filesystems
     """
-    # Initialize project generator
-    generator = DbtProjectGenerator(project_name, project_dir)
-    
-    # Extract unique layers from configuration
-    layers = {model['layer'] for model in models_config['models']}
+    if package:
+        # Build the project in local scratch space and stream it to the target
+        # as one archive, so the target filesystem only sees a single file
+        project_path = Path(project_dir).resolve()
+        with tempfile.TemporaryDirectory() as staging_dir:
+            staged_project = Path(staging_dir) / project_path.name
+            generate_dbt_project(
+                project_name, str(staged_project), models_config, sql_base_dir, sources_config
+            )
+            archive_path = project_path.with_name(project_path.name + '.tar')
+            archive_path.parent.mkdir(parents=True, exist_ok=True)
+            
+            # Stream into a temporary file next to the archive and move it into
+            # place, so a failed write never leaves a truncated archive behind
+            fd, temp_archive = tempfile.mkstemp(
+                prefix=f'.{archive_path.name}.', dir=archive_path.parent
+            )
+            try:
+                with os.fdopen(fd, 'wb') as f, \
+                        tarfile.open(fileobj=f, mode='w|', bufsize=_WRITE_BUFFER_SIZE) as tar:
+                    tar.add(staged_project, arcname=project_path.name)
+                # mkstemp creates the file private to the owner
+                os.chmod(temp_archive, 0o644)
+                os.replace(temp_archive, archive_path)
+            except BaseException:
+                os.remove(temp_archive)
+                raise
+        return
     
-    # Create project structure with dynamic layers
-    generator.create_project_structure(layers, sources_config)
+    # Split model configurations into parallel columns in a single pass
+    names, sql_files, model_layers, configs = tuple(zip(*(
+        (model['name'], model.get('sql'), model['layer'], model.get('config'))
+        for model in models_config['models']
+    ))) or ((), (), (), ())
     
-    # Create model.yml files for each layer
-    for layer in layers:
-        generator.create_model_yml(layer, models_config)
+    # Extract unique layers from configuration
+    layers = set(model_layers)
     
-    # Create models
-    for model in models_config['models']:
-        model_name = model['name']
-        sql_file = model.get('sql')
-        
+    # Check that every model's SQL file exists before generating anything, with
+    # one directory listing per SQL directory instead of a stat per model. Names
+    # missing from the listing still get a stat, which covers case-insensitive
+    # filesystems and directories that can be traversed but not listed
+    sql_dir_files: Dict[Path, Set[str]] = {}
+    for model_name, sql_file in zip(names, sql_files):
         if not sql_file:
             raise ValueError(f"SQL file path not specified for model: {model_name}")
             
-        # Read SQL content from file
         sql_path = Path(sql_base_dir) / sql_file
-        if not sql_path.exists():
+        present = sql_dir_files.get(sql_path.parent)
+        if present is None:
+            present = sql_dir_files[sql_path.parent] = _existing_files(sql_path.parent)
+        if sql_path.name not in present and not sql_path.exists():
             raise FileNotFoundError(f"SQL file not found: {sql_path}")
-            
-        with open(sql_path, 'r') as f:
-            sql_content = f.read()
-            
-        generator.create_model_from_sql(
-            sql_content=sql_content,
-            model_name=model_name,
-            layer=model['layer'],
-            config=model.get('config')
+    
+    # Models whose names clean to the same file would write it concurrently, so
+    # keep only the last model per target, as the serial loop effectively did
+    targets = {
+        (layer, _MODEL_NAME_RE.sub('_', model_name)): index
+        for index, (model_name, layer) in enumerate(zip(names, model_layers))
+    }
+    if len(targets) < len(names):
+        keep = sorted(targets.values())
+        names, sql_files, model_layers, configs = (
+            [column[index] for index in keep]
+            for column in (names, sql_files, model_layers, configs)
         )
+    
+    # Initialize project generator; leaving the block closes its layer descriptors
+    with DbtProjectGenerator(project_name, project_dir) as generator:
+        # Create project structure with dynamic layers
+        generator.create_project_structure(layers, sources_config)
+    
+        # Create model.yml files for each layer
+        for layer in layers:
+            generator.create_model_yml(layer, models_config)
+    
+        # Create models concurrently; reading and writing model files is I/O bound
+        max_workers = min(32, (os.cpu_count() or 1) * 4)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = executor.map(
+                _generate_model,
+                repeat(generator), names, sql_files, model_layers, configs, repeat(sql_base_dir)
+            )
+            # Consume results so the first failure is raised in model order
+            for _ in results:
+                pass
 
 def load_models_config(config_file: str) -> Dict:
     """
     Load models configuration from YAML file
     
+    Parsed configs are cached by file content hash, so loading an unchanged
+    file again skips the YAML parse and returns the same dictionary.
+    
     Args:
         config_file: Path to YAML configuration file
         
     Returns:
         Dictionary containing model configurations
     """
-    with open(config_file, 'r') as f:
-        return yaml.safe_load(f)
+    with open(config_file, 'rb') as f:
+        data = f.read()
+    
+    path = os.path.abspath(config_file)
+    digest = hashlib.sha256(data).digest()
+    cached = _models_config_cache.get(path)
+    if cached is not None and cached[0] == digest:
+        return cached[1]
+    
+    yaml, _, SafeLoader = _yaml_api()
+    config = yaml.load(data, Loader=SafeLoader)
+    _models_config_cache[path] = (digest, config)
+    return config
 
 # Example usage
 if __name__ == "__main__":